@@ -1,15 +1,19 @@
+import copy
 import time
+import random
 import json
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional, Tuple
 from urllib.parse import urljoin
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 import parse
 import requests
+from requests.adapters import HTTPAdapter
 from dagster import get_dagster_logger, resource, Failure, Field, StringSource, __version__
 
-from dagster_stitch.utils import BearerAuth
 from dagster_stitch.types import StitchOutput
 
 
@@ -17,6 +21,16 @@ STITCH_API_BASE = "https://api.stitchdata.com/"
 STITCH_API_VERSION = "v4/"
 
 DEFAULT_POLL_INTERVAL = 10.0
+INITIAL_POLL_INTERVAL = 1.0
+POLL_INTERVAL_BACKOFF = 1.5
+
+RETRY_BACKOFF_MAX_EXPONENT = 10
+RETRY_AFTER_MAX_DELAY = 300.0
+
+STREAM_SCHEMA_MAX_WORKERS = 8
+
+EXTRACTIONS_CACHE_TTL = 2.0
+EXTRACTION_NOT_FOUND_MAX_POLLS = 5
 
 API_BASE_URL = urljoin(STITCH_API_BASE, STITCH_API_VERSION)
 
@@ -24,6 +38,31 @@ STITCH_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 STITCH_LOG_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S,%fZ"
 
 
+def _parse_retry_after(retry_after: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header, given either as delay-seconds or an HTTP-date, into seconds"""
+    if not retry_after:
+        return None
+
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _parse_stitch_timestamp(timestamp: str) -> datetime:
+    """Parse a Stitch API timestamp (STITCH_DATETIME_FORMAT) into a naive UTC datetime"""
+    return datetime.fromisoformat(timestamp.rstrip("Z"))
+
+
 class StitchResource:
     """Exposes the Stitch REST API as a Dagster resource.
 
@@ -33,7 +72,11 @@ class StitchResource:
     Args:
         api_key (str): The API key for the Stitch account that this resource will interact with.
         account_id (str): The account ID for the Stitch account that this resource will interact with.
-        request_max_retries (int): The maximum number of times to retry a failed request.
+        request_max_retries (int): The maximum number of times to retry a failed request. Rate
+            limited (429) responses do not count towards this limit.
+        request_max_rate_limit_retries (int): The maximum number of times to retry a rate limited
+            (429) request, waiting at least as long as the server's Retry-After header (up to
+            RETRY_AFTER_MAX_DELAY seconds) between attempts.
         default_poll_interval (float): The default number of seconds to wait between polling the
             Stitch API for a request status.
         default_extraction_timeout (Optional[float]): The default maximum time that will waited
@@ -41,8 +84,12 @@ class StitchResource:
             out.
         default_load_timeout (Optional[float]): The default maximum time that will waited before a
             sync is timed out during the load phase. By default, this will never time out.
-        request_retry_delay (float): The number of seconds to wait between retries of a failed
-            request.
+        request_retry_delay (float): The base number of seconds to wait between retries of a failed
+            request. Retries back off exponentially from this delay, with full jitter.
+        request_retry_max_delay (float): The maximum number of seconds to wait between retries of a
+            failed request.
+        request_cache_ttl (float): The number of seconds to cache responses to idempotent GET
+            requests for. Set to 0 to disable caching.
         log (logging.Logger): The logger to use for logging messages.
     """
 
@@ -51,64 +98,159 @@ class StitchResource:
         api_key: str,
         account_id: int,
         request_max_retries: int = 3,
+        request_max_rate_limit_retries: int = 10,
         default_poll_interval: float = DEFAULT_POLL_INTERVAL,
         default_extraction_timeout: Optional[float] = None,
         default_load_timeout: Optional[float] = None,
         request_retry_delay: float = 0.25,
+        request_retry_max_delay: float = 15.0,
+        request_cache_ttl: float = 30.0,
         log: logging.Logger = get_dagster_logger(),
     ):
-        self._auth = BearerAuth(api_key)
         self._account_id = account_id
 
         self._request_max_retries = request_max_retries
+        self._request_max_rate_limit_retries = request_max_rate_limit_retries
         self._default_poll_interval = default_poll_interval
         self._default_extraction_timeout = default_extraction_timeout
         self._default_load_timeout = default_load_timeout
         self._request_retry_delay = request_retry_delay
+        self._request_retry_max_delay = request_retry_max_delay
         self._log = log
 
-    def make_request(self, method: str, endpoint: str, data: Optional[str] = None) -> dict:
+        # Parsed GET responses keyed by (method, url), with the monotonic time they were fetched
+        self._cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._cache_ttl = request_cache_ttl
+
+        # Share a single keep-alive session so polling reuses the underlying TCP/TLS connection
+        self._session = requests.Session()
+        self._session.headers.update(
+            {
+                "Authorization": f"Bearer {api_key}",
+                "User-Agent": f"Dagster/{__version__}",
+                "Content-Type": "application/json",
+            }
+        )
+        self._session.mount(
+            "https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, pool_block=False)
+        )
+
+    def close(self):
+        """Close the underlying HTTP session and release any pooled connections."""
+        self._session.close()
+
+    def make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[str] = None,
+        cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        refresh_cache: bool = False,
+        allow_not_found: bool = False,
+    ) -> dict:
         """Make a request to the Stitch API.
 
         Args:
             method (str): The HTTP method to use for the request.
-            endpoint (str): The endpoint to make the request to.
+            endpoint (str): The endpoint to make the request to, relative to API_BASE_URL.
             data (Optional[str]): The data to send with the request.
+            cache (bool): Whether a GET response may be served from, and stored in, the response
+                cache. Should be disabled for endpoints whose state is being polled.
+            cache_ttl (Optional[float]): Overrides the resource's cache TTL in seconds for this
+                request. Has no effect if caching is disabled for the resource.
+            refresh_cache (bool): Whether to store a GET response in the cache even if it was not
+                read from it, so that polled state fetched fresh can be reused by cached readers.
+            allow_not_found (bool): Whether to return an empty result rather than failing if a GET
+                request's resource is not found. Only for callers that handle an empty result.
 
         Returns:
-            Dict[str, Any]: The JSON-parsed response from the Stitch API.
+            Dict[str, Any]: The JSON-parsed response from the Stitch API, or an empty dict if a GET
+                request's resource was not found and allow_not_found is set.
 
         Raises:
-            Failure: If the request fails after the maximum number of retries.
+            Failure: If the request fails with a non-retryable client error, or fails after the
+                maximum number of retries or rate limited retries.
         """
-        url = urljoin(API_BASE_URL, endpoint)
-        headers = {
-            "User-Agent": f"Dagster/{__version__}",
-            "Content-Type": "application/json",
-        }
+        # Endpoints are always relative, so concatenate rather than paying for urljoin's parsing
+        url = API_BASE_URL + endpoint.lstrip("/")
+
+        if cache_ttl is None:
+            cache_ttl = self._cache_ttl
+
+        cache_key = (method, url)
+        cacheable = method == "GET" and self._cache_ttl > 0 and cache_ttl > 0
+        use_cache = cache and cacheable
+        store_cache = (cache or refresh_cache) and cacheable
+        if use_cache and cache_key in self._cache:
+            fetched_at, cached_response = self._cache[cache_key]
+            if time.monotonic() - fetched_at < cache_ttl:
+                return copy.deepcopy(cached_response)
 
         retries = 0
+        rate_limited_retries = 0
         while retries < self._request_max_retries:
             try:
-                response = requests.request(
-                    method, url, headers=headers, auth=self._auth, data=data
-                )
+                response = self._session.request(method, url, data=data)
+
+                # A missing resource is an expected answer to some lookups, so return it as empty
+                if allow_not_found and method == "GET" and response.status_code == 404:
+                    return {}
                 response.raise_for_status()
 
                 if "application/json" not in response.headers.get("Content-Type", ""):
-                    return response.text
-
-                response_json = response.json()
-                if type(response_json) is not dict:
-                    return response_json
-                elif "next" in response_json.get("links", {}):
-                    self._log.warning("Pagination not yet implemented")
-
-                return response_json["data"] if "data" in response_json else response_json
+                    result = response.text
+                else:
+                    # Decode the raw bytes directly, skipping requests' encoding detection
+                    try:
+                        response_json = json.loads(response.content) if response.content else {}
+                    except ValueError as e:
+                        raise requests.exceptions.InvalidJSONError(str(e), response=response)
+
+                    if not isinstance(response_json, dict):
+                        result = response_json
+                    else:
+                        links = response_json.get("links")
+                        if links and "next" in links:
+                            self._log.warning("Pagination not yet implemented")
+                        result = response_json["data"] if "data" in response_json else response_json
+
+                # Cache a copy so callers are free to mutate the results they are given
+                if store_cache:
+                    self._cache[cache_key] = (time.monotonic(), copy.deepcopy(result))
+                return result
             except requests.exceptions.RequestException as e:
                 self._log.error(f"Request to Stitch API at <{url}> failed: {str(e)}")
-                retries += 1
-                time.sleep(self._request_retry_delay)
+
+                # Client errors other than rate limiting will not resolve themselves on retry
+                status_code = e.response.status_code if e.response is not None else None
+                if status_code is not None and 400 <= status_code < 500 and status_code != 429:
+                    raise Failure(f"Request to Stitch API at <{url}> failed: {str(e)}")
+
+                # Exponential backoff with full jitter to avoid synchronized retries
+                exponent = min(retries + rate_limited_retries, RETRY_BACKOFF_MAX_EXPONENT)
+                delay = random.random() * min(
+                    self._request_retry_delay * (2**exponent), self._request_retry_max_delay
+                )
+
+                # Never retry sooner than the server asked us to, within reason
+                if status_code in (429, 503):
+                    retry_after = _parse_retry_after(e.response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        delay = max(delay, min(retry_after, RETRY_AFTER_MAX_DELAY))
+
+                # Rate limiting is cooperative backpressure, so it has its own retry limit
+                if status_code == 429:
+                    if rate_limited_retries >= self._request_max_rate_limit_retries:
+                        raise Failure(
+                            f"Request to Stitch API at <{url}> was still rate limited after"
+                            f" {self._request_max_rate_limit_retries} retries"
+                        )
+                    rate_limited_retries += 1
+                else:
+                    retries += 1
+
+                time.sleep(delay)
 
         raise Failure(
             f"Request to Stitch API at <{url}> failed after reaching max retries"
@@ -127,7 +269,7 @@ class StitchResource:
         Returns:
             Dict[str, Any]: The data source metadata object.
         """
-        return self.make_request("GET", f"sources/{data_source_id}")
+        return self.make_request("GET", f"sources/{data_source_id}", allow_not_found=True)
 
     def list_all_sources(self) -> dict:
         """List all data sources
@@ -172,22 +314,28 @@ class StitchResource:
         schema = self.make_request("GET", f"sources/{data_source_id}/streams/{stream_id}")
         type_properties = json.loads(schema["schema"].replace("\\", "")).get("properties", {})
 
-        return {
-            "schema": {
-                property["breadcrumb"][1]: next(
-                    (
-                        property_type
-                        for property_type in type_properties.get(property["breadcrumb"][1], {}).get(
-                            "type", []
-                        )
-                        if property_type != "null"
-                    ),
-                    "any",
-                )
-                for property in schema["metadata"]
-                if "properties" in property["breadcrumb"] and property["metadata"]["selected"]
-            },
-        }
+        columns = {}
+        for property in schema["metadata"]:
+            # Column breadcrumbs are ordered as ["properties", <column name>]
+            breadcrumb = property["breadcrumb"]
+            if (
+                len(breadcrumb) < 2
+                or breadcrumb[0] != "properties"
+                or not property["metadata"].get("selected")
+            ):
+                continue
+
+            column = breadcrumb[1]
+            columns[column] = next(
+                (
+                    property_type
+                    for property_type in type_properties.get(column, {}).get("type", [])
+                    if property_type != "null"
+                ),
+                "any",
+            )
+
+        return {"schema": columns}
 
     def list_recent_loads(self, data_source_name: Optional[str] = None) -> dict:
         """Get the recent loads, optionally filtered by data source
@@ -204,15 +352,12 @@ class StitchResource:
             Dict[str, Dict[str, Dict[str, Any]]]: A nested dictionary mapping data source names to
                 stream names to load metadata objects.
         """
-        loads = self.make_request("GET", f"{self._account_id}/loads")
+        loads = self.make_request("GET", f"{self._account_id}/loads", cache=False)
 
         # Nested dict of loads by data source then stream name
         all_loads = {}
         for load in loads:
-            if load["source_name"] not in all_loads:
-                all_loads[load["source_name"]] = {}
-
-            all_loads[load["source_name"]][load["stream_name"]] = load
+            all_loads.setdefault(load["source_name"], {})[load["stream_name"]] = load
 
         if data_source_name:
             return all_loads.get(data_source_name, {})
@@ -244,7 +389,9 @@ class StitchResource:
         )
         return response, extraction_start
 
-    def get_extractions(self, data_source_id: Optional[int] = None) -> dict:
+    def get_extractions(
+        self, data_source_id: Optional[int] = None, use_cache: bool = False
+    ) -> dict:
         """Lists all extractions for the account in array, optionally filtered by data source
 
         Maps from Stitch's list of extractions to a dict of extractions keyed by the (unique) data source_id
@@ -253,12 +400,23 @@ class StitchResource:
         Args:
             data_source_id (Optional[int]): The ID of the data source to filter extractions by. If specified,
                 only extractions for the given data source will be returned.
+            use_cache (bool): Whether to accept the account's extractions if they were fetched within
+                the last EXTRACTIONS_CACHE_TTL seconds, including by a status poll, since Stitch
+                returns every data source at once. Defaults to False, as extractions are polled for
+                job status.
 
         Returns:
             Dict[str, Dict[str, Any]]: A dictionary mapping data source IDs to the extractions for that data source.
         """
-        extractions = self.make_request("GET", f"{self._account_id}/extractions")
-        extraction_map = {extractions["source_id"]: extractions for extractions in extractions}
+        extractions = self.make_request(
+            "GET",
+            f"{self._account_id}/extractions",
+            cache=use_cache,
+            cache_ttl=EXTRACTIONS_CACHE_TTL,
+            refresh_cache=True,
+            allow_not_found=True,
+        )
+        extraction_map = {extraction["source_id"]: extraction for extraction in extractions}
 
         if data_source_id is not None:
             return extraction_map.get(data_source_id, {})
@@ -280,8 +438,10 @@ class StitchResource:
 
         """
         extraction_logs = self.make_request(
-            "GET", f"{self._account_id}/extractions/{extraction_job_name}"
+            "GET", f"{self._account_id}/extractions/{extraction_job_name}", cache=False
         )
+        if not extraction_logs:
+            raise Failure(f"Logs not found for extraction job {extraction_job_name}")
 
         replications = {
             replication.named["stream_name"]: int(replication.named["count_records"])
@@ -314,7 +474,9 @@ class StitchResource:
 
         Args:
             data_source_id (int): The ID of the data source to start a replication job for.
-            poll_interval (Optional[float]): The interval in seconds to poll for job completion.
+            poll_interval (Optional[float]): The maximum interval in seconds to poll for job
+                completion. Polling starts at INITIAL_POLL_INTERVAL and backs off towards this
+                interval, resetting whenever the job state changes.
             extraction_timeout (Optional[float]): The timeout in seconds for the extract stage.
             load_timeout (Optional[float]): The timeout in seconds for the load stage.
 
@@ -332,124 +494,151 @@ class StitchResource:
             raise Failure(f"Data source {data_source_id} not found")
 
         replication_response, extraction_start = self.start_replication_job(data_source_id)
+        extraction_started_at = time.monotonic()
 
+        current_interval = min(INITIAL_POLL_INTERVAL, poll_interval)
+        previous_job_name = None
+        not_found_polls = 0
         while True:
             extraction = self.get_extractions(data_source_id)
-            if not extraction:  # TODO: Test first-run behaviour
-                raise Failure(f"Extraction not found for data source {data_source_id}")
-
-            self._log.info(
-                f"Polled extractions for source {data_source_id}: Found job"
-                f" {extraction['job_name']} started at {extraction['start_time']}"
-            )
-
-            if (
-                extraction["job_name"] == replication_response["job_name"]
-                or datetime.strptime(extraction["start_time"], STITCH_DATETIME_FORMAT)
-                >= extraction_start  # In case another job completes during polling
-            ):
-                for failure_mode in ("discovery", "tap", "target"):
-                    if not extraction[f"{failure_mode}_exit_status"]:
-                        self._log.info(f"{failure_mode.title()} still in progress")
-                        continue
-
-                    if extraction[f"{failure_mode}_exit_status"] != 0:
-                        raise Failure(
-                            f"{failure_mode.title()} failed with exit status"
-                            f" {extraction[f'{failure_mode}_exit_status']}:"
-                            f" {extraction[f'{failure_mode}_description']}"
-                        )
+            if not extraction:
+                # Stitch may briefly not have registered the data source's first extraction job
+                not_found_polls += 1
+                if not_found_polls >= EXTRACTION_NOT_FOUND_MAX_POLLS:
+                    raise Failure(f"Extraction not found for data source {data_source_id}")
+                self._log.info(f"Extraction for source {data_source_id} not yet found")
+            else:
+                not_found_polls = 0
+                if previous_job_name is not None and extraction["job_name"] != previous_job_name:
+                    current_interval = min(INITIAL_POLL_INTERVAL, poll_interval)
+                previous_job_name = extraction["job_name"]
 
                 self._log.info(
-                    f"Extraction job for source {data_source_id} completed:"
-                    f" {extraction['job_name']}\nCompare {extraction['start_time']} >="
-                    f" {extraction_start}"
+                    f"Polled extractions for source {data_source_id}: Found job"
+                    f" {extraction['job_name']} started at {extraction['start_time']}"
                 )
-                break
 
-            if (
-                extraction_timeout
-                and (datetime.utcnow() - extraction_start).total_seconds() > extraction_timeout
-            ):
+                if (
+                    extraction["job_name"] == replication_response["job_name"]
+                    or _parse_stitch_timestamp(extraction["start_time"])
+                    >= extraction_start  # In case another job completes during polling
+                ):
+                    for failure_mode in ("discovery", "tap", "target"):
+                        if not extraction[f"{failure_mode}_exit_status"]:
+                            self._log.info(f"{failure_mode.title()} still in progress")
+                            continue
+
+                        if extraction[f"{failure_mode}_exit_status"] != 0:
+                            raise Failure(
+                                f"{failure_mode.title()} failed with exit status"
+                                f" {extraction[f'{failure_mode}_exit_status']}:"
+                                f" {extraction[f'{failure_mode}_description']}"
+                            )
+
+                    self._log.info(
+                        f"Extraction job for source {data_source_id} completed:"
+                        f" {extraction['job_name']}\nCompare {extraction['start_time']} >="
+                        f" {extraction_start}"
+                    )
+                    break
+
+            if extraction_timeout and time.monotonic() - extraction_started_at > extraction_timeout:
                 raise Failure(
                     f"Extraction job for source {data_source_id} timed out after"
                     f" {extraction_timeout} seconds"
                 )
 
-            time.sleep(poll_interval)
+            time.sleep(current_interval)
+            current_interval = min(current_interval * POLL_INTERVAL_BACKOFF, poll_interval)
 
         # Parse logs, get expected loads
         stream_extractions, load_start = self.get_extraction_logs(extraction["job_name"])
         streams = self.list_streams(data_source_id)
+        selected_streams = {
+            stream_id: stream
+            for stream_id, stream in streams.items()
+            if stream["metadata"]["selected"]
+        }
 
+        # Keyed by stream name, since that is how loads are reported
         expected_loads = {
-            stream: {
-                "rows": stream_extractions.get(streams[stream]["stream_name"], 0),
+            stream["stream_name"]: {
+                "rows": stream_extractions.get(stream["stream_name"], 0),
                 "logs": set(),
             }
-            for stream in streams
-            if streams[stream]["metadata"]["selected"]
+            for stream in selected_streams.values()
         }
 
+        load_started_at = time.monotonic()
+        current_interval = min(INITIAL_POLL_INTERVAL, poll_interval)
+        previous_loads = None
         loading_complete = False
         while not loading_complete:
             loads = self.list_recent_loads(source_metadata["name"])
             if not loads:
                 raise Failure(f"Load not found for data source {source_metadata['name']}")
 
+            if previous_loads is not None and loads != previous_loads:
+                current_interval = min(INITIAL_POLL_INTERVAL, poll_interval)
+            previous_loads = loads
+
             self._log.info(f"Polled loads for source {data_source_id}")
             loading_complete = True
-            for stream_id in expected_loads:
-                if expected_loads[stream_id]["rows"] == 0:
-                    if "skipped" not in expected_loads[stream_id]["logs"]:
+            for stream_name, expected_load in expected_loads.items():
+                if expected_load["rows"] == 0:
+                    if "skipped" not in expected_load["logs"]:
                         self._log.info(
-                            f"Skipping load for stream {streams[stream_id]['stream_name']}"
-                            " since it has no rows"
+                            f"Skipping load for stream {stream_name} since it has no rows"
                         )
-                        expected_loads[stream_id]["logs"].add("skipped")
+                        expected_load["logs"].add("skipped")
                     continue
-                if streams[stream_id]["stream_name"] not in loads:
-                    if "not_found" not in expected_loads[stream_id]["logs"]:
-                        self._log.warning(
-                            f"Load for stream {streams[stream_id]['stream_name']} not yet found"
-                        )
-                        expected_loads[stream_id]["logs"].add("not_found")
+
+                load = loads.get(stream_name)
+                if load is None:
+                    if "not_found" not in expected_load["logs"]:
+                        self._log.warning(f"Load for stream {stream_name} not yet found")
+                        expected_load["logs"].add("not_found")
                     loading_complete = False
-                elif loads[streams[stream_id]["stream_name"]]["error_state"]:
-                    if "failed" not in expected_loads[stream_id]["logs"]:
+                elif load["error_state"]:
+                    if "failed" not in expected_load["logs"]:
                         self._log.warning(
-                            f"Load for stream {streams[stream_id]['stream_name']} failed:"
-                            f" {loads[streams[stream_id]['stream_name']]['error_state']['notification_data']['message']}"
+                            f"Load for stream {stream_name} failed:"
+                            f" {load['error_state']['notification_data']['message']}"
                         )
-                        expected_loads[stream_id]["logs"].add("failed")
+                        expected_load["logs"].add("failed")
                 elif (
-                    loads[streams[stream_id]["stream_name"]]["last_batch_loaded_at"] is None
-                    or datetime.strptime(
-                        loads[streams[stream_id]["stream_name"]]["last_batch_loaded_at"],
-                        STITCH_DATETIME_FORMAT,
-                    )
-                    < load_start
+                    load["last_batch_loaded_at"] is None
+                    or _parse_stitch_timestamp(load["last_batch_loaded_at"]) < load_start
                 ):
                     self._log.info(
-                        f"Load for stream {streams[stream_id]['stream_name']} not yet complete:"
-                        f" {loads[streams[stream_id]['stream_name']]['last_batch_loaded_at']} <"
-                        f" {load_start}"
+                        f"Load for stream {stream_name} not yet complete:"
+                        f" {load['last_batch_loaded_at']} < {load_start}"
                     )
                     loading_complete = False
 
             if not loading_complete:
-                if load_timeout and (datetime.utcnow() - load_start).total_seconds() > load_timeout:
+                if load_timeout and time.monotonic() - load_started_at > load_timeout:
                     raise Failure(
                         f"Load for source {data_source_id} timed out after {load_timeout} seconds"
                     )
-                time.sleep(poll_interval)
-
+                time.sleep(current_interval)
+                current_interval = min(current_interval * POLL_INTERVAL_BACKOFF, poll_interval)
+
+        # Each stream schema is a separate request, so fetch them concurrently. Unselected streams
+        # were not replicated, so they are reported without fetching a column schema
+        with ThreadPoolExecutor(max_workers=STREAM_SCHEMA_MAX_WORKERS) as executor:
+            schemas = dict(
+                zip(
+                    selected_streams,
+                    executor.map(
+                        lambda stream_id: self.get_stream_schema(data_source_id, stream_id),
+                        selected_streams,
+                    ),
+                )
+            )
         stream_schemas = {
-            stream_id: {
-                **self.get_stream_schema(data_source_id, stream_id),
-                **{"name": streams[stream_id]["stream_name"]},
-            }
-            for stream_id in streams.keys()
+            stream_id: {**schemas.get(stream_id, {"schema": {}}), **{"name": stream["stream_name"]}}
+            for stream_id, stream in streams.items()
         }
 
         return StitchOutput(source_metadata, extraction, loads, stream_schemas)
@@ -478,6 +667,14 @@ class StitchResource:
             default_value=3,
             description="The maximum number of times to retry a failed request to the Stitch API.",
         ),
+        "request_max_rate_limit_retries": Field(
+            int,
+            default_value=10,
+            description=(
+                "The maximum number of times to retry a request to the Stitch API that was rate"
+                " limited. These retries do not count towards request_max_retries."
+            ),
+        ),
         "default_poll_interval": Field(
             float,
             default_value=10,
@@ -503,28 +700,54 @@ class StitchResource:
             float,
             default_value=0.25,
             description=(
-                "The number of seconds to wait before retrying a failed request to the Stitch API."
+                "The base number of seconds to wait before retrying a failed request to the Stitch"
+                " API. Retries back off exponentially from this delay, with full jitter."
+            ),
+        ),
+        "request_retry_max_delay": Field(
+            float,
+            default_value=15.0,
+            description=(
+                "The maximum number of seconds to wait before retrying a failed request to the"
+                " Stitch API."
+            ),
+        ),
+        "request_cache_ttl": Field(
+            float,
+            default_value=30.0,
+            description=(
+                "The number of seconds to cache responses to idempotent GET requests to the Stitch"
+                " API, such as data source and stream metadata. Set to 0 to disable caching."
             ),
         ),
     },
     description="This resource manages Stitch data sources and replication jobs.",
 )
-def stitch_resource(context) -> StitchResource:
+def stitch_resource(context) -> Iterator[StitchResource]:
     """Dagster resource for interacting with the Stitch API.
 
+    The underlying HTTP session is closed when the resource is torn down.
+
     Args:
         context (ResourceDefinition.Context): The Dagster resource context.
 
-    Returns:
+    Yields:
         StitchResource: The Dagster-managed Stitch resource API wrapper.
     """
-    return StitchResource(
+    stitch = StitchResource(
         api_key=context.resource_config["api_key"],
         account_id=context.resource_config["account_id"],
         request_max_retries=context.resource_config["request_max_retries"],
+        request_max_rate_limit_retries=context.resource_config["request_max_rate_limit_retries"],
         default_poll_interval=context.resource_config["default_poll_interval"],
         default_extraction_timeout=context.resource_config["default_extraction_timeout"],
         default_load_timeout=context.resource_config["default_load_timeout"],
         request_retry_delay=context.resource_config["request_retry_delay"],
+        request_retry_max_delay=context.resource_config["request_retry_max_delay"],
+        request_cache_ttl=context.resource_config["request_cache_ttl"],
         log=context.log,
     )
+    try:
+        yield stitch
+    finally:
+        stitch.close()
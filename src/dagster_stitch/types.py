@@ -31,6 +31,7 @@ class StitchOutput(
             For more details, see: https://www.stitchdata.com/docs/developers/stitch-connect/api#load--object
         stream_schema (Dict[str, Any]):
             The raw Stitch API response containing the schema of each stream in the data source. Consists of an object
-            with a key for each stream in the data source, whose value is a list of values specified in the schema. For more,
+            with a key for each stream in the data source, whose value is a list of values specified in the schema. Streams
+            not selected for replication have an empty schema. For more,
             see: https://www.stitchdata.com/docs/developers/stitch-connect/api#retrieve-a-streams-schema
     """
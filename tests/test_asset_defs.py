@@ -9,7 +9,9 @@ from utils import (
     DATA_SOURCE_NAME,
     API_KEY,
     ACCOUNT_ID,
+    STREAM_ID,
     STREAM_NAME,
+    get_list_streams_response,
     mock_sync_requests,
 )
 
@@ -54,3 +56,39 @@ def test_stitch_asset_run():
             mat.event_specific_data.materialization.asset_key for mat in asset_materializations
         )
         assert found_asset_keys == {AssetKey([DATA_SOURCE_NAME, STREAM_NAME])}
+
+
+def test_stitch_asset_run_unselected_stream():
+    """Test that a destination table whose stream is not selected still produces an output"""
+    resource = stitch_resource.configured({"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    tables = [f"{DATA_SOURCE_NAME}.{STREAM_NAME}", f"{DATA_SOURCE_NAME}.unselected"]
+
+    assets = build_stitch_assets(data_source_id=DATA_SOURCE_ID, destination_tables=tables)
+
+    with responses.RequestsMock() as response_mock:
+        mock_sync_requests(response_mock)
+
+        list_streams_response = get_list_streams_response()
+        list_streams_response.append(
+            {
+                **list_streams_response[0],
+                "stream_id": STREAM_ID + 1,
+                "stream_name": "unselected",
+                "metadata": {**list_streams_response[0]["metadata"], "selected": False},
+            }
+        )
+        response_mock.replace(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/streams",
+            json=list_streams_response,
+        )
+
+        result = materialize_to_memory(assets, resources={"stitch": resource})
+        assert result.success
+
+        outputs = [
+            event
+            for event in result.events_for_node(f"stitch_sync_{DATA_SOURCE_ID}")
+            if event.event_type_value == "STEP_OUTPUT"
+        ]
+        assert len(outputs) == len(tables)
@@ -1,8 +1,16 @@
+import datetime
+
 import pytest
 import responses
 
-from dagster import Failure, build_init_resource_context
-from dagster_stitch.resources import stitch_resource
+from dagster import Failure, build_init_resource_context, build_resources
+from dagster_stitch.resources import (
+    EXTRACTION_NOT_FOUND_MAX_POLLS,
+    INITIAL_POLL_INTERVAL,
+    RETRY_AFTER_MAX_DELAY,
+    StitchResource,
+    stitch_resource,
+)
 
 from utils import (
     ACCOUNT_ID,
@@ -18,16 +26,28 @@ from utils import (
     get_list_loads_response,
     get_list_streams_response,
     get_stream_schema_response,
+    mock_sync_requests,
 )
 
 
+def test_stitch_resource_teardown(monkeypatch):
+    """Test that the resource closes its HTTP session when torn down"""
+    closed = []
+    monkeypatch.setattr(StitchResource, "close", lambda self: closed.append(self))
+
+    with build_resources(
+        {"stitch": stitch_resource.configured({"api_key": API_KEY, "account_id": ACCOUNT_ID})}
+    ) as resources:
+        assert not closed, "Session closed before teardown"
+
+    assert closed == [resources.stitch], "Session not closed on teardown"
+
+
 def test_start_replication_job():
     """Test that the start_replication_job method works as expected."""
-    resource = stitch_resource(
+    with stitch_resource(
         build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
-    )
-
-    with responses.RequestsMock() as response_mock:
+    ) as resource, responses.RequestsMock() as response_mock:
         json_response = {"job_name": JOB_ID}
 
         response_mock.add(
@@ -38,25 +58,26 @@ def test_start_replication_job():
 
         actual_response, _ = resource.start_replication_job(DATA_SOURCE_ID)
         assert actual_response == json_response, "Replication job did not produce expected result."
+        assert (
+            response_mock.calls[0].request.headers["Authorization"] == f"Bearer {API_KEY}"
+        ), "Request was not authenticated with the API key."
 
 
 @pytest.mark.parametrize("max_retries,actual_retries", [(2, 1), (2, 3), (4, 4)])
 def test_get_replication_job_retries(max_retries: int, actual_retries: int):
     """Test behaviour of the get_replication_job method on request errors"""
-    resource = stitch_resource(
-        build_init_resource_context(
-            config={
-                "api_key": API_KEY,
-                "account_id": ACCOUNT_ID,
-                "request_max_retries": max_retries,
-                "request_retry_delay": 0,
-            }
-        )
+    context = build_init_resource_context(
+        config={
+            "api_key": API_KEY,
+            "account_id": ACCOUNT_ID,
+            "request_max_retries": max_retries,
+            "request_retry_delay": 0,
+        }
     )
     json_response = {"job_name": JOB_ID}
 
     def _mock_response():
-        with responses.RequestsMock() as response_mock:
+        with stitch_resource(context) as resource, responses.RequestsMock() as response_mock:
             for _ in range(actual_retries):
                 response_mock.add(
                     responses.POST,
@@ -79,15 +100,106 @@ def test_get_replication_job_retries(max_retries: int, actual_retries: int):
             _mock_response()
 
 
+@pytest.mark.parametrize("status", [401, 404])
+def test_client_error_not_retried(status: int):
+    """Test that non-retryable client errors fail immediately rather than exhausting retries"""
+    context = build_init_resource_context(
+        config={"api_key": API_KEY, "account_id": ACCOUNT_ID, "request_retry_delay": 0}
+    )
+
+    with stitch_resource(context) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.POST,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/sync",
+            status=status,
+        )
+
+        with pytest.raises(Failure):
+            resource.start_replication_job(DATA_SOURCE_ID)
+        assert len(response_mock.calls) == 1, "Client error should not have been retried"
+
+
+def test_rate_limit_not_counted_as_retry():
+    """Test that rate limited requests respect Retry-After and do not exhaust retries"""
+    context = build_init_resource_context(
+        config={
+            "api_key": API_KEY,
+            "account_id": ACCOUNT_ID,
+            "request_max_retries": 2,
+            "request_retry_delay": 0,
+        }
+    )
+    json_response = {"job_name": JOB_ID}
+
+    with stitch_resource(context) as resource, responses.RequestsMock() as response_mock:
+        for _ in range(3):
+            response_mock.add(
+                responses.POST,
+                f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/sync",
+                status=429,
+                headers={"Retry-After": "0"},
+            )
+        response_mock.add(
+            responses.POST,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/sync",
+            json=json_response,
+        )
+
+        actual_response, _ = resource.start_replication_job(DATA_SOURCE_ID)
+        assert actual_response == json_response
+
+
+def test_rate_limit_retries_exhausted(monkeypatch):
+    """Test that a persistently rate limited request gives up, clamping excessive Retry-After"""
+    sleeps = []
+    monkeypatch.setattr("dagster_stitch.resources.time.sleep", sleeps.append)
+    context = build_init_resource_context(
+        config={
+            "api_key": API_KEY,
+            "account_id": ACCOUNT_ID,
+            "request_max_rate_limit_retries": 3,
+        }
+    )
+
+    with stitch_resource(context) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.POST,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/sync",
+            status=429,
+            headers={"Retry-After": "86400"},
+        )
+
+        with pytest.raises(Failure, match="rate limited"):
+            resource.start_replication_job(DATA_SOURCE_ID)
+        assert len(response_mock.calls) == 4
+        assert sleeps == [RETRY_AFTER_MAX_DELAY] * 3
+
+
+def test_get_missing_data_source():
+    """Test that a missing resource is returned as empty rather than retried"""
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}",
+            status=404,
+        )
+
+        assert resource.get_data_source(DATA_SOURCE_ID) == {}
+        assert len(response_mock.calls) == 1, "Missing resource should not have been retried"
+
+        with pytest.raises(Failure, match="not found"):
+            resource.start_replication_job_and_poll(DATA_SOURCE_ID)
+
+
 def test_get_sources():
     """Test the get_sources method works as expected.
     We use this to get some relevant metadata, in particular the data source string name for asset keys.
     """
-    resource = stitch_resource(
+    with stitch_resource(
         build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
-    )
-
-    with responses.RequestsMock() as response_mock:
+    ) as resource, responses.RequestsMock() as response_mock:
         json_response = get_sources_response()
 
         response_mock.add(
@@ -104,15 +216,26 @@ def test_get_sources():
         ), "Data source name not found in list of sources"
 
 
+@pytest.mark.parametrize("endpoint", ["sources", "/sources"])
+def test_make_request_relative_endpoint(endpoint: str):
+    """Test that endpoints are always resolved relative to the versioned API base URL"""
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.GET, "https://api.stitchdata.com/v4/sources", json=get_sources_response()
+        )
+
+        assert resource.make_request("GET", endpoint) == get_sources_response()
+
+
 def test_list_streams():
     """Test that the list_streams method works as expected.
     We want to verify this one in particular because the Stitch API returns a list, not a dict per usual
     """
-    resource = stitch_resource(
+    with stitch_resource(
         build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
-    )
-
-    with responses.RequestsMock() as response_mock:
+    ) as resource, responses.RequestsMock() as response_mock:
         json_response = get_list_streams_response()
 
         response_mock.add(
@@ -128,13 +251,84 @@ def test_list_streams():
         ), "Stream metadata not found in list of streams"
 
 
+@pytest.mark.parametrize("cache_ttl,expected_calls", [(30.0, 1), (0, 2)])
+def test_list_streams_cached(cache_ttl: float, expected_calls: int):
+    """Test that repeated GET requests are served from the response cache while it is enabled"""
+    context = build_init_resource_context(
+        config={"api_key": API_KEY, "account_id": ACCOUNT_ID, "request_cache_ttl": cache_ttl}
+    )
+
+    with stitch_resource(context) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/streams",
+            json=get_list_streams_response(),
+        )
+
+        assert resource.list_streams(DATA_SOURCE_ID) == resource.list_streams(DATA_SOURCE_ID)
+        assert len(response_mock.calls) == expected_calls
+
+
+@pytest.mark.parametrize("cache_ttl,expected_calls", [(30.0, 2), (0, 4)])
+def test_get_extractions_cached(cache_ttl: float, expected_calls: int):
+    """Test that polled extractions are reused by lookups that opt in to the cache, and only those
+    """
+    context = build_init_resource_context(
+        config={"api_key": API_KEY, "account_id": ACCOUNT_ID, "request_cache_ttl": cache_ttl}
+    )
+
+    with stitch_resource(context) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/extractions",
+            json=get_extraction_response(),
+        )
+
+        assert resource.get_extractions(DATA_SOURCE_ID)["job_name"] == JOB_ID
+        assert resource.get_extractions(DATA_SOURCE_ID, use_cache=True)["job_name"] == JOB_ID
+        assert DATA_SOURCE_ID in resource.get_extractions(use_cache=True)
+        assert resource.get_extractions(DATA_SOURCE_ID)["job_name"] == JOB_ID
+        assert len(response_mock.calls) == expected_calls
+
+
+def test_cached_response_isolated():
+    """Test that mutating a cached result does not affect later callers"""
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}",
+            json={"name": DATA_SOURCE_NAME},
+        )
+
+        resource.get_data_source(DATA_SOURCE_ID)["name"] = "mutated"
+        resource.get_data_source(DATA_SOURCE_ID)["name"] = "mutated again"
+        assert resource.get_data_source(DATA_SOURCE_ID) == {"name": DATA_SOURCE_NAME}
+        assert len(response_mock.calls) == 1
+
+
+def test_list_streams_not_found_not_retried():
+    """Test that a 404 for an endpoint that does not allow it fails fast rather than being empty"""
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        response_mock.add(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/streams",
+            status=404,
+        )
+
+        with pytest.raises(Failure):
+            resource.list_streams(DATA_SOURCE_ID)
+        assert len(response_mock.calls) == 1
+
+
 def test_get_stream_schema():
     """Test that the get_stream_schema method works as expected."""
-    resource = stitch_resource(
+    with stitch_resource(
         build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
-    )
-
-    with responses.RequestsMock() as response_mock:
+    ) as resource, responses.RequestsMock() as response_mock:
         json_response = get_stream_schema_response()
 
         response_mock.add(
@@ -150,11 +344,9 @@ def test_get_stream_schema():
 @pytest.mark.parametrize("failure_stage", ["start", "extract", None])
 def test_start_replication_job_and_poll(failure_stage):
     """Test that the start_replication_job_and_poll method works as expected."""
-    resource = stitch_resource(
+    with stitch_resource(
         build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
-    )
-
-    with responses.RequestsMock() as response_mock:
+    ) as resource, responses.RequestsMock() as response_mock:
         # Start replication job
         sync_response = {"job_name": JOB_ID}
         response_mock.add(
@@ -212,7 +404,178 @@ def test_start_replication_job_and_poll(failure_stage):
             )
 
         if failure_stage:
+            # An extraction that never appears for the data source eventually fails
             with pytest.raises(Failure):
-                resource.start_replication_job_and_poll(DATA_SOURCE_ID)
+                resource.start_replication_job_and_poll(DATA_SOURCE_ID, poll_interval=0.01)
         else:
             resource.start_replication_job_and_poll(DATA_SOURCE_ID)
+
+
+def test_start_replication_job_and_poll_backoff(monkeypatch):
+    """Test that polling starts quickly and backs off towards the poll interval"""
+    sleeps = []
+    monkeypatch.setattr("dagster_stitch.resources.time.sleep", sleeps.append)
+
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        mock_sync_requests(response_mock)
+
+        # Poll a previous extraction job twice before ours is registered
+        stale_extraction_response = get_extraction_response()
+        stale_extraction_response["data"][0]["job_name"] = "previous"
+        extractions_url = f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/extractions"
+        response_mock.remove(responses.GET, extractions_url)
+        for extraction_response in (stale_extraction_response,) * 2 + (get_extraction_response(),):
+            response_mock.add(responses.GET, extractions_url, json=extraction_response)
+
+        resource.start_replication_job_and_poll(DATA_SOURCE_ID, poll_interval=1.2)
+        assert sleeps == [1.0, 1.2]
+
+
+def test_start_replication_job_and_poll_backoff_reset_on_job_change(monkeypatch):
+    """Test that the extraction poll interval resets when a different extraction job is seen"""
+    sleeps = []
+    monkeypatch.setattr("dagster_stitch.resources.time.sleep", sleeps.append)
+
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        mock_sync_requests(response_mock)
+
+        # Another job replaces the previous one before ours is registered
+        extractions_url = f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/extractions"
+        response_mock.remove(responses.GET, extractions_url)
+        for job_name in ("previous", "previous", "other", JOB_ID):
+            extraction_response = get_extraction_response()
+            extraction_response["data"][0]["job_name"] = job_name
+            response_mock.add(responses.GET, extractions_url, json=extraction_response)
+
+        resource.start_replication_job_and_poll(DATA_SOURCE_ID, poll_interval=10)
+        assert sleeps == [INITIAL_POLL_INTERVAL, 1.5, INITIAL_POLL_INTERVAL]
+
+
+def test_start_replication_job_and_poll_backoff_reset_on_load_change(monkeypatch):
+    """Test that the load poll interval resets when the polled loads change"""
+    sleeps = []
+    monkeypatch.setattr("dagster_stitch.resources.time.sleep", sleeps.append)
+
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        mock_sync_requests(response_mock)
+
+        # Extract rows for the stream so that its load is waited on
+        response_mock.replace(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/extractions/{JOB_ID}",
+            body=get_extraction_logs_response().replace(DATA_SOURCE_NAME, STREAM_NAME),
+            content_type="application/octet-stream",
+        )
+
+        # Two identical stale polls, a changed but still stale poll, then the completed load
+        loads_url = f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/loads"
+        response_mock.remove(responses.GET, loads_url)
+        for loaded_at in (
+            datetime.datetime(2000, 1, 1),
+            datetime.datetime(2000, 1, 1),
+            datetime.datetime(2001, 1, 1),
+            None,
+        ):
+            response_mock.add(responses.GET, loads_url, json=get_list_loads_response(loaded_at))
+
+        resource.start_replication_job_and_poll(DATA_SOURCE_ID, poll_interval=10)
+        assert sleeps == [INITIAL_POLL_INTERVAL, 1.5, INITIAL_POLL_INTERVAL]
+
+
+def test_start_replication_job_and_poll_extraction_timeout(monkeypatch):
+    """Test that the extraction stage times out based on elapsed polling time"""
+    clock = [0.0]
+    monkeypatch.setattr("dagster_stitch.resources.time.monotonic", lambda: clock[0])
+    monkeypatch.setattr(
+        "dagster_stitch.resources.time.sleep",
+        lambda seconds: clock.__setitem__(0, clock[0] + seconds),
+    )
+
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock(assert_all_requests_are_fired=False) as response_mock:
+        mock_sync_requests(response_mock)
+
+        # Stitch never registers our extraction job
+        stale_extraction_response = get_extraction_response()
+        stale_extraction_response["data"][0]["job_name"] = "previous"
+        extractions_url = f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/extractions"
+        response_mock.replace(responses.GET, extractions_url, json=stale_extraction_response)
+
+        with pytest.raises(Failure, match="timed out"):
+            resource.start_replication_job_and_poll(
+                DATA_SOURCE_ID, poll_interval=10, extraction_timeout=30
+            )
+        assert 30 < clock[0] <= 40
+
+
+def test_start_replication_job_and_poll_selected_schemas():
+    """Test that all streams are reported, but schemas are only fetched for selected streams"""
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        mock_sync_requests(response_mock)
+
+        # Add an unselected stream, whose schema is never mocked
+        list_streams_response = get_list_streams_response()
+        list_streams_response.append(
+            {
+                **list_streams_response[0],
+                "stream_id": STREAM_ID + 1,
+                "metadata": {**list_streams_response[0]["metadata"], "selected": False},
+            }
+        )
+        response_mock.replace(
+            responses.GET,
+            f"https://api.stitchdata.com/v4/sources/{DATA_SOURCE_ID}/streams",
+            json=list_streams_response,
+        )
+
+        stitch_output = resource.start_replication_job_and_poll(DATA_SOURCE_ID)
+        assert list(stitch_output.stream_schema) == [STREAM_ID, STREAM_ID + 1]
+        assert stitch_output.stream_schema[STREAM_ID]["schema"]
+        assert stitch_output.stream_schema[STREAM_ID + 1] == {"schema": {}, "name": STREAM_NAME}
+
+
+def test_start_replication_job_and_poll_extraction_not_yet_found(monkeypatch):
+    """Test that polling continues if the extraction is not found before Stitch registers it"""
+    monkeypatch.setattr("dagster_stitch.resources.time.sleep", lambda seconds: None)
+
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock() as response_mock:
+        mock_sync_requests(response_mock)
+
+        extractions_url = f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/extractions"
+        response_mock.remove(responses.GET, extractions_url)
+        response_mock.add(responses.GET, extractions_url, status=404)
+        response_mock.add(responses.GET, extractions_url, json=get_extraction_response())
+
+        stitch_output = resource.start_replication_job_and_poll(DATA_SOURCE_ID)
+        assert stitch_output.extraction_details["job_name"] == JOB_ID
+
+
+def test_start_replication_job_and_poll_extraction_never_found(monkeypatch):
+    """Test that an extraction which is never registered fails after a bounded number of polls"""
+    monkeypatch.setattr("dagster_stitch.resources.time.sleep", lambda seconds: None)
+
+    with stitch_resource(
+        build_init_resource_context(config={"api_key": API_KEY, "account_id": ACCOUNT_ID})
+    ) as resource, responses.RequestsMock(assert_all_requests_are_fired=False) as response_mock:
+        mock_sync_requests(response_mock)
+
+        extractions_url = f"https://api.stitchdata.com/v4/{ACCOUNT_ID}/extractions"
+        response_mock.replace(responses.GET, extractions_url, status=404)
+
+        with pytest.raises(Failure, match="Extraction not found"):
+            resource.start_replication_job_and_poll(DATA_SOURCE_ID)
+        extraction_calls = [
+            call for call in response_mock.calls if call.request.url == extractions_url
+        ]
+        assert len(extraction_calls) == EXTRACTION_NOT_FOUND_MAX_POLLS